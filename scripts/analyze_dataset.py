@@ -8,11 +8,14 @@ Does NOT modify images - analysis only.
 
 Usage:
     python scripts/analyze_dataset.py [--data-dir PATH] [--output PATH]
+    python scripts/analyze_dataset.py --no-cache
     python scripts/analyze_dataset.py --help
 
 Output:
     - Console summary
     - JSON report at logs/dataset_report.json
+    - Per-image analysis cache at logs/.analyze_cache.json (reused for
+      images whose path, mtime and size are unchanged)
 """
 
 import argparse
@@ -20,17 +23,28 @@ import json
 import os
 import sys
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 # Optional imports with graceful fallback
 try:
-    from PIL import Image, ExifTags
+    from PIL import Image
     HAS_PIL = True
 except ImportError:
     HAS_PIL = False
     print("[WARN] Pillow not installed. Some features disabled.")
 
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
 try:
     import imagehash
     HAS_IMAGEHASH = True
@@ -38,62 +52,209 @@ except ImportError:
     HAS_IMAGEHASH = False
 
 try:
-    import cv2
     import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import cv2
     HAS_CV2 = True
 except ImportError:
     HAS_CV2 = False
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Blur scoring needs OpenCV, or Numba as a fallback
+HAS_BLUR = HAS_CV2 or HAS_NUMBA
+
 # Constants
 SUPPORTED_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff'}
-SUPPORTED_CAPTION_EXTENSIONS = {'.txt', '.caption'}
+SUPPORTED_CAPTION_EXTENSIONS = ('.txt', '.caption')  # in lookup priority order
+
+# EXIF Orientation tag (274) and the rotation each value implies
+EXIF_ORIENTATION_TAG = 0x0112
+ORIENTATION_ROTATION = {3: 180, 6: 270, 8: 90}
+
+# Up to this many distinct hashes, duplicate search uses a dense N x N
+# Hamming matrix (8 * N^2 bytes) instead of the BK-tree
+DENSE_DUPLICATE_LIMIT = 2048
+
+# Bump when the cached per-image fields change meaning
+ANALYSIS_CACHE_VERSION = 3
+ANALYSIS_CACHE_NAME = '.analyze_cache.json'
 
 # Aspect ratio buckets (64px steps per sd-scripts)
 BUCKET_STEP = 64
 
+# Images are scored for sharpness at a fixed size so scores are comparable
+BLUR_SCORE_SIZE = 512
+
+# Below this many images to analyze, pool startup costs more than it saves
+MIN_PARALLEL_IMAGES = 8
+
 
 def find_images(data_dir: Path) -> list[Path]:
     """Find all supported image files in directory."""
     images = []
 
-    # Check direct files
-    for ext in SUPPORTED_IMAGE_EXTENSIONS:
-        images.extend(data_dir.glob(f'*{ext}'))
-        images.extend(data_dir.glob(f'*{ext.upper()}'))
+    # List data_dir and its images/ subdirectory once each, filtering by
+    # suffix (case-insensitive, so .JPG and .Jpg are both picked up)
+    for directory in (data_dir, data_dir / 'images'):
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if (os.path.splitext(entry.name)[1].lower() in SUPPORTED_IMAGE_EXTENSIONS
+                            and entry.is_file()):
+                        images.append(Path(entry.path))
+        except OSError:
+            continue
 
-    # Check images/ subdirectory
-    images_subdir = data_dir / 'images'
-    if images_subdir.exists():
-        for ext in SUPPORTED_IMAGE_EXTENSIONS:
-            images.extend(images_subdir.glob(f'*{ext}'))
-            images.extend(images_subdir.glob(f'*{ext.upper()}'))
+    return sorted(images)
 
-    return sorted(set(images))
 
+def scan_captions(directory: Path) -> dict[str, Path]:
+    """Map image stem -> caption file for one directory using a single listing."""
+    captions = {}
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                stem, ext = os.path.splitext(entry.name)
+                if ext not in SUPPORTED_CAPTION_EXTENSIONS or not entry.is_file():
+                    continue
+                current = captions.get(stem)
+                if current is None or (SUPPORTED_CAPTION_EXTENSIONS.index(ext)
+                                       < SUPPORTED_CAPTION_EXTENSIONS.index(current.suffix)):
+                    captions[stem] = Path(entry.path)
+    except OSError:
+        pass
+    return captions
+
+
+def find_caption(image_path: Path, data_dir: Path,
+                 caption_index: Optional[dict[Path, dict[str, Path]]] = None) -> Optional[Path]:
+    """Find caption file for an image.
+
+    Pass the same `caption_index` dict across calls so each directory is
+    listed once instead of stat-ing every candidate path per image.
+    """
+    if caption_index is None:
+        caption_index = {}
+
+    # Check alongside image, then captions/ subdirectory
+    for directory in (image_path.parent, data_dir / 'captions'):
+        if directory not in caption_index:
+            caption_index[directory] = scan_captions(directory)
+        caption_path = caption_index[directory].get(image_path.stem)
+        if caption_path is not None:
+            return caption_path
 
-def find_caption(image_path: Path, data_dir: Path) -> Optional[Path]:
-    """Find caption file for an image."""
-    stem = image_path.stem
+    return None
 
-    # Check alongside image
-    for ext in SUPPORTED_CAPTION_EXTENSIONS:
-        caption_path = image_path.with_suffix(ext)
-        if caption_path.exists():
-            return caption_path
 
-    # Check captions/ subdirectory
-    captions_dir = data_dir / 'captions'
-    if captions_dir.exists():
-        for ext in SUPPORTED_CAPTION_EXTENSIONS:
-            caption_path = captions_dir / f'{stem}{ext}'
-            if caption_path.exists():
-                return caption_path
+if HAS_NUMBA:
+    @njit(cache=True, nogil=True, fastmath=True)
+    def _lap_var(arr):
+        """Variance of the 4-neighbour Laplacian over the image interior."""
+        h, w = arr.shape
+        s = 0.0
+        ss = 0.0
+        n = 0
+        for i in range(1, h - 1):
+            for j in range(1, w - 1):
+                v = 4.0 * arr[i, j] - arr[i - 1, j] - arr[i + 1, j] - arr[i, j - 1] - arr[i, j + 1]
+                s += v
+                ss += v * v
+                n += 1
+        m = s / n
+        return ss / n - m * m
+
+
+def _resize_linear(arr: "np.ndarray", size: int) -> "np.ndarray":
+    """Bilinear resize of a uint8 image to size x size, matching cv2.resize.
+
+    Uses OpenCV's INTER_LINEAR sampling (pixel-centre aligned, no
+    antialiasing) and rounds back to uint8, so the fallback scores on the
+    same scale as the cv2 path. PIL's BILINEAR antialiases when downscaling,
+    which smooths away much of the high-frequency detail being measured.
+    """
+    def taps(n_in):
+        x = np.clip((np.arange(size) + 0.5) * (n_in / size) - 0.5, 0, n_in - 1)
+        x0 = x.astype(np.intp)
+        return x0, np.minimum(x0 + 1, n_in - 1), (x - x0).astype(np.float32)
+
+    y0, y1, fy = taps(arr.shape[0])
+    x0, x1, fx = taps(arr.shape[1])
+    rows = arr[y0].astype(np.float32) * (1 - fy)[:, None] + arr[y1] * fy[:, None]
+    out = rows[:, x0] * (1 - fx) + rows[:, x1] * fx
+    return np.clip(np.rint(out), 0, 255).astype(np.uint8)
+
+
+def _laplacian_variance(gray: "Image.Image") -> float:
+    """Laplacian variance of a grayscale image at the fixed scoring size."""
+    if not HAS_CV2:
+        # Numba fallback for installs without OpenCV
+        arr = np.asarray(gray)
+        if arr.shape != (BLUR_SCORE_SIZE, BLUR_SCORE_SIZE):
+            arr = _resize_linear(arr, BLUR_SCORE_SIZE)
+        return round(float(_lap_var(arr.astype(np.float32))), 2)
+
+    arr = np.asarray(gray)
+    # cv2's (non-antialiased) resize keeps scores on the scale the thresholds were tuned for
+    if arr.shape != (BLUR_SCORE_SIZE, BLUR_SCORE_SIZE):
+        arr = cv2.resize(arr, (BLUR_SCORE_SIZE, BLUR_SCORE_SIZE))
+    # meanStdDev reduces in a single C pass with double accumulation
+    _, std = cv2.meanStdDev(cv2.Laplacian(arr.astype(np.float32), cv2.CV_32F))
+    return round(float(std[0, 0]) ** 2, 2)
+
+
+def read_metadata(img: "Image.Image") -> dict:
+    """Read size, mode, format and EXIF rotation from an open image.
+
+    Only the header and EXIF block are touched, so the caller can keep using
+    `img` for pixel work without reopening the file.
+    """
+    meta = {
+        'width': img.width,
+        'height': img.height,
+        'aspect_ratio': round(img.width / img.height, 3),
+        'mode': img.mode,
+        'format': img.format,
+        'rotation': 0,
+    }
 
-    return None
+    # Check EXIF for rotation
+    try:
+        orientation = img.getexif().get(EXIF_ORIENTATION_TAG)
+        meta['rotation'] = ORIENTATION_ROTATION.get(orientation, 0)
+    except Exception:
+        pass
+
+    return meta
+
+
+def _to_gray(img: "Image.Image") -> "Image.Image":
+    """8-bit grayscale copy of img, independent of source format and bit depth.
+
+    PIL's convert('L') clips 16/32-bit integer modes instead of scaling them,
+    which would wash out 16-bit PNGs and TIFFs; scale those down like OpenCV.
+    """
+    if HAS_NUMPY and (img.mode == 'I' or img.mode.startswith('I;16')):
+        arr = np.asarray(img).astype(np.uint32) >> 8
+        return Image.fromarray(np.minimum(arr, 255).astype(np.uint8))
+    return img.convert('L')
 
 
 def get_image_info(image_path: Path) -> dict:
-    """Extract information from an image file."""
+    """Extract information from an image file.
+
+    The file is opened and decoded once; metadata, perceptual hash and blur
+    score are all derived from that single pass.
+    """
     info = {
         'path': str(image_path),
         'name': image_path.name,
@@ -105,26 +266,22 @@ def get_image_info(image_path: Path) -> dict:
 
     try:
         with Image.open(image_path) as img:
-            info['width'] = img.width
-            info['height'] = img.height
-            info['aspect_ratio'] = round(img.width / img.height, 3)
-            info['mode'] = img.mode
-            info['format'] = img.format
-
-            # Check EXIF for rotation
-            info['rotation'] = 0
-            try:
-                exif = img._getexif()
-                if exif:
-                    for tag_id, value in exif.items():
-                        tag = ExifTags.TAGS.get(tag_id, tag_id)
-                        if tag == 'Orientation':
-                            # Orientation values: 3=180, 6=270, 8=90
-                            rotation_map = {3: 180, 6: 270, 8: 90}
-                            info['rotation'] = rotation_map.get(value, 0)
-                            break
-            except (AttributeError, KeyError):
-                pass
+            info.update(read_metadata(img))
+
+            if HAS_IMAGEHASH or HAS_BLUR:
+                try:
+                    # Full-resolution decode for every format: a DCT-reduced
+                    # JPEG decode would pull blur scores well below the
+                    # recommendation thresholds and shift phashes. phash and
+                    # blur share this one grayscale input.
+                    gray = _to_gray(img)
+
+                    if HAS_IMAGEHASH:
+                        info['phash'] = str(imagehash.phash(gray))
+                    if HAS_BLUR:
+                        info['blur_score'] = _laplacian_variance(gray)
+                except Exception:
+                    pass
 
     except Exception as e:
         info['error'] = str(e)
@@ -134,34 +291,96 @@ def get_image_info(image_path: Path) -> dict:
 
 def calculate_blur_score(image_path: Path) -> Optional[float]:
     """Calculate blur score using Laplacian variance (higher = sharper)."""
-    if not HAS_CV2:
-        return None
+    return get_image_info(image_path).get('blur_score')
 
-    try:
-        img = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
-        if img is None:
-            return None
 
-        # Resize for consistent scoring
-        img = cv2.resize(img, (512, 512))
+def calculate_perceptual_hash(image_path: Path) -> Optional[str]:
+    """Calculate perceptual hash for duplicate detection."""
+    return get_image_info(image_path).get('phash')
+
+
+def _hamming(a: int, b: int) -> int:
+    """Hamming distance between two integer-encoded hashes."""
+    return bin(a ^ b).count('1')
+
+
+class _BKTree:
+    """Minimal BK-tree for Hamming-radius queries over integer hashes."""
+
+    def __init__(self):
+        self._root = None  # [value, index, {distance: child}]
+
+    def add(self, value: int, index: int) -> None:
+        if self._root is None:
+            self._root = [value, index, {}]
+            return
+        node = self._root
+        while True:
+            d = _hamming(value, node[0])
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, index, {}]
+                return
+            node = child
+
+    def query(self, value: int, threshold: int) -> list[int]:
+        """Return indices of all stored hashes within `threshold` of `value`."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node_value, node_index, children = stack.pop()
+            d = _hamming(value, node_value)
+            if d <= threshold:
+                found.append(node_index)
+            # Triangle inequality: only subtrees in [d - t, d + t] can match
+            for dist, child in children.items():
+                if d - threshold <= dist <= d + threshold:
+                    stack.append(child)
+        return found
+
+
+def _near_matches_tree(parsed: list[tuple[list[str], Optional[int]]], threshold: int) -> list[list[int]]:
+    """For each single-image hash, indices of later hashes within threshold (BK-tree)."""
+    # Build the tree back to front, querying each entry before inserting it,
+    # so the tree only ever holds later entries and every match is a new pair
+    tree = _BKTree()
+    near = [[] for _ in parsed]
+    for i in range(len(parsed) - 1, -1, -1):
+        paths, value = parsed[i]
+        if value is None:
+            continue
+        if len(paths) == 1:
+            near[i] = sorted(tree.query(value, threshold))
+        tree.add(value, i)
+    return near
 
-        # Laplacian variance
-        laplacian_var = cv2.Laplacian(img, cv2.CV_64F).var()
-        return round(laplacian_var, 2)
-    except Exception:
-        return None
 
+@lru_cache(maxsize=1)
+def _popcount_lut() -> "np.ndarray":
+    """Bit count of every byte value, built once per process."""
+    return np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
 
-def calculate_perceptual_hash(image_path: Path) -> Optional[str]:
-    """Calculate perceptual hash for duplicate detection."""
-    if not HAS_IMAGEHASH or not HAS_PIL:
-        return None
 
-    try:
-        with Image.open(image_path) as img:
-            return str(imagehash.phash(img))
-    except Exception:
-        return None
+def _popcount64(x: "np.ndarray") -> "np.ndarray":
+    """Per-element popcount of a uint64 array."""
+    if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+        return np.bitwise_count(x)
+    return _popcount_lut()[x.view(np.uint8)].reshape(*x.shape, 8).sum(axis=-1)
+
+
+def _near_matches_dense(parsed: list[tuple[list[str], Optional[int]]], threshold: int) -> list[list[int]]:
+    """Same as _near_matches_tree, via a full pairwise Hamming matrix in NumPy."""
+    idx = [i for i, (_, value) in enumerate(parsed) if value is not None]
+    arr = np.fromiter((parsed[i][1] for i in idx), dtype=np.uint64, count=len(idx))
+    dists = _popcount64(np.bitwise_xor(arr[:, None], arr[None, :]))
+
+    near = [[] for _ in parsed]
+    # argwhere yields (row, col) in row-major order, i.e. later entries ascending
+    for a, b in np.argwhere(np.triu(dists <= threshold, k=1)).tolist():
+        i = idx[a]
+        if len(parsed[i][0]) == 1:
+            near[i].append(idx[b])
+    return near
 
 
 def find_duplicates(hashes: dict[str, list[str]], threshold: int = 5) -> list[list[str]]:
@@ -169,28 +388,55 @@ def find_duplicates(hashes: dict[str, list[str]], threshold: int = 5) -> list[li
     if not HAS_IMAGEHASH:
         return []
 
-    duplicates = []
-    hash_list = list(hashes.items())
+    # Parse each hex hash once up front
+    parsed = []
+    for hash_hex, paths in hashes.items():
+        try:
+            parsed.append((paths, int(hash_hex, 16)))
+        except ValueError:
+            parsed.append((paths, None))
+
+    # A dense N x N matrix is fastest for typical dataset sizes; fall back to
+    # the BK-tree for very large sets or hashes wider than 64 bits
+    if (HAS_NUMPY and len(parsed) <= DENSE_DUPLICATE_LIMIT
+            and all(value is None or value < 1 << 64 for _, value in parsed)):
+        near = _near_matches_dense(parsed, threshold)
+    else:
+        near = _near_matches_tree(parsed, threshold)
 
-    for i, (hash1, paths1) in enumerate(hash_list):
+    duplicates = []
+    for (paths1, _), matches in zip(parsed, near):
         # Same hash = exact duplicates
         if len(paths1) > 1:
             duplicates.append(paths1)
             continue
 
         # Similar hashes (within threshold)
-        for hash2, paths2 in hash_list[i+1:]:
-            try:
-                h1 = imagehash.hex_to_hash(hash1)
-                h2 = imagehash.hex_to_hash(hash2)
-                if h1 - h2 <= threshold:
-                    duplicates.append(paths1 + paths2)
-            except Exception:
-                pass
+        for j in matches:
+            duplicates.append(paths1 + parsed[j][0])
 
     return duplicates
 
 
+def find_duplicates_by_aspect(hash_buckets: dict[float, dict[str, list[str]]],
+                              threshold: int = 5) -> list[list[str]]:
+    """Find duplicates within each aspect-ratio bucket.
+
+    pHash distance says little about images with different layouts, so only
+    images sharing an aspect bin are compared, which also shrinks the pair
+    search from N^2 to the sum of squared bucket sizes.
+    """
+    duplicates = []
+    for bucket in sorted(hash_buckets):
+        duplicates.extend(find_duplicates(hash_buckets[bucket], threshold))
+    return duplicates
+
+
+def analyze_one(image_path: Path) -> dict:
+    """Run all per-image checks for a single image (safe to call in a worker process)."""
+    return get_image_info(image_path)
+
+
 def calculate_bucket_resolution(width: int, height: int, base_reso: int = 512) -> tuple[int, int]:
     """Calculate the bucket resolution for an image."""
     aspect = width / height
@@ -210,6 +456,46 @@ def calculate_bucket_resolution(width: int, height: int, base_reso: int = 512) -
     return bucket_w, bucket_h
 
 
+def aspect_bin(aspect_ratio: float) -> float:
+    """Bin an aspect ratio to one decimal (matches the NumPy binning below)."""
+    return round(aspect_ratio * 10) / 10
+
+
+def resolution_stats(resolutions: list[tuple[int, int]]) -> dict:
+    """Min/max/average width and height across all images."""
+    if HAS_NUMPY:
+        res = np.asarray(resolutions, dtype=np.int32)
+        min_w, min_h = res.min(0).tolist()
+        max_w, max_h = res.max(0).tolist()
+        avg_w, avg_h = res.mean(0).tolist()
+    else:
+        widths = [w for w, h in resolutions]
+        heights = [h for w, h in resolutions]
+        min_w, min_h = min(widths), min(heights)
+        max_w, max_h = max(widths), max(heights)
+        avg_w, avg_h = sum(widths) / len(widths), sum(heights) / len(heights)
+
+    return {
+        'min_width': min_w,
+        'min_height': min_h,
+        'max_width': max_w,
+        'max_height': max_h,
+        'avg_width': int(avg_w),
+        'avg_height': int(avg_h),
+    }
+
+
+def aspect_ratio_distribution(aspect_ratios: list[float]) -> dict[float, int]:
+    """Count images per aspect ratio, binned to one decimal, sorted by ratio."""
+    if HAS_NUMPY:
+        bins = np.round(np.asarray(aspect_ratios, dtype=np.float64) * 10).astype(np.int64)
+        counts = np.bincount(bins)
+        nonzero = np.flatnonzero(counts)
+        return dict(zip((nonzero / 10).tolist(), counts[nonzero].tolist()))
+
+    return dict(sorted(Counter(aspect_bin(ar) for ar in aspect_ratios).items()))
+
+
 def analyze_captions(caption_paths: list[Path]) -> dict:
     """Analyze caption files for patterns and issues."""
     analysis = {
@@ -222,7 +508,10 @@ def analyze_captions(caption_paths: list[Path]) -> dict:
         'warnings': []
     }
 
-    caption_texts = []
+    # Running totals instead of keeping every caption text around
+    caption_count = 0
+    total_length = 0
+    seen_captions = set()
     word_counts = Counter()
 
     for path in caption_paths:
@@ -236,25 +525,25 @@ def analyze_captions(caption_paths: list[Path]) -> dict:
                 analysis['empty'] += 1
                 continue
 
-            caption_texts.append(text)
-            words = text.lower().split()
-            word_counts.update(words)
+            caption_count += 1
+            total_length += len(text)
+            seen_captions.add(text)
+            word_counts.update(text.lower().split())
 
         except Exception:
             analysis['missing'] += 1
 
-    if caption_texts:
-        analysis['avg_length'] = round(sum(len(c) for c in caption_texts) / len(caption_texts), 1)
-        analysis['unique_captions'] = len(set(caption_texts))
+    if caption_count:
+        analysis['avg_length'] = round(total_length / caption_count, 1)
+        analysis['unique_captions'] = len(seen_captions)
 
         # Check for repeated identical captions
-        if analysis['unique_captions'] < len(caption_texts) * 0.5:
+        if analysis['unique_captions'] < caption_count * 0.5:
             analysis['warnings'].append("Many duplicate captions detected - add variety")
 
         # Check for potential trigger tokens (uncommon words appearing in most captions)
-        total_captions = len(caption_texts)
         for word, count in word_counts.most_common(20):
-            if count >= total_captions * 0.8 and len(word) > 3:
+            if count >= caption_count * 0.8 and len(word) > 3:
                 analysis['has_trigger_token'] += 1
                 break
 
@@ -291,13 +580,8 @@ def generate_recommendations(
 
     # Resolution recommendations
     if resolutions:
-        min_width = min(w for w, h in resolutions)
-        min_height = min(h for w, h in resolutions)
-        max_width = max(w for w, h in resolutions)
-        max_height = max(h for w, h in resolutions)
-
-        min_dim = min(min_width, min_height)
-        max_dim = max(max_width, max_height)
+        stats = resolution_stats(resolutions)
+        min_dim = min(stats['min_width'], stats['min_height'])
 
         # Base resolution
         if min_dim >= 1024:
@@ -321,14 +605,18 @@ def generate_recommendations(
 
     # Aspect ratio diversity
     if aspect_ratios:
-        unique_ratios = len(set(round(ar, 1) for ar in aspect_ratios))
+        unique_ratios = len(aspect_ratio_distribution(aspect_ratios))
         if unique_ratios < 3:
             recommendations['warnings'].append("Low aspect ratio diversity - consider varied crops")
 
         # Check for extreme ratios
-        extreme = [ar for ar in aspect_ratios if ar < 0.5 or ar > 2.0]
+        if HAS_NUMPY:
+            ars = np.asarray(aspect_ratios, dtype=np.float64)
+            extreme = int(((ars < 0.5) | (ars > 2.0)).sum())
+        else:
+            extreme = sum(1 for ar in aspect_ratios if ar < 0.5 or ar > 2.0)
         if extreme:
-            recommendations['warnings'].append(f"{len(extreme)} images have extreme aspect ratios")
+            recommendations['warnings'].append(f"{extreme} images have extreme aspect ratios")
 
     # Blur analysis
     if blur_scores:
@@ -354,6 +642,52 @@ def generate_recommendations(
     return recommendations
 
 
+def _cache_key(image_path: Path) -> str:
+    """Cache key that changes whenever the file is modified."""
+    st = image_path.stat()
+    return f"{image_path}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def _cache_backends() -> str:
+    """Which optional backends produced the cached values (scores differ between them)."""
+    blur = 'cv2' if HAS_CV2 else ('numba' if HAS_NUMBA else 'none')
+    return f"pil={HAS_PIL},imagehash={HAS_IMAGEHASH},blur={blur}"
+
+
+def load_analysis_cache(cache_path: Path) -> dict[str, dict]:
+    """Load cached per-image results, or {} if missing, unreadable or stale."""
+    try:
+        data = json.loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+    if (not isinstance(data, dict)
+            or data.get('version') != ANALYSIS_CACHE_VERSION
+            or data.get('backends') != _cache_backends()):
+        return {}
+    return data.get('entries', {})
+
+
+def save_analysis_cache(cache_path: Path, entries: dict[str, dict]) -> None:
+    """Persist per-image results; failures only cost the next run a recompute."""
+    data = {
+        'version': ANALYSIS_CACHE_VERSION,
+        'backends': _cache_backends(),
+        'entries': entries,
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_bytes(_dumps(data))
+    except OSError as e:
+        print(f"[WARN] Could not write analysis cache: {e}")
+
+
+def write_report(report: dict, output_path: Path) -> None:
+    """Write the JSON report, creating the parent directory if needed."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(_dumps(report))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Analyze dataset for Identity LoRA training',
@@ -386,6 +720,12 @@ Examples:
         help='Show detailed per-image information'
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'Ignore and do not update the per-image cache ({ANALYSIS_CACHE_NAME} next to the report)'
+    )
+
     args = parser.parse_args()
 
     # Normalize paths
@@ -422,10 +762,7 @@ Examples:
             'data_dir': str(data_dir)
         }
 
-        # Ensure output directory exists
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        write_report(report, output_path)
 
         sys.exit(1)
 
@@ -442,9 +779,7 @@ Examples:
             'data_dir': str(data_dir)
         }
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        write_report(report, output_path)
 
         sys.exit(1)
 
@@ -456,12 +791,47 @@ Examples:
     resolutions = []
     aspect_ratios = []
     blur_scores = []
-    hashes = defaultdict(list)
+    hash_buckets = defaultdict(lambda: defaultdict(list))
     rotated_images = []
     caption_paths = []
 
-    for img_path in images:
-        info = get_image_info(img_path)
+    # Reuse results for images unchanged since the last run
+    cache_path = output_path.parent / ANALYSIS_CACHE_NAME
+    cache = {} if args.no_cache else load_analysis_cache(cache_path)
+    cache_keys = [_cache_key(p) for p in images]
+    results = [dict(cache[k]) if k in cache else None for k in cache_keys]
+    misses = [i for i, info in enumerate(results) if info is None]
+
+    if len(misses) < len(images):
+        print(f"Using cached analysis for {len(images) - len(misses)} unchanged images")
+
+    # Per-image work is independent, so fan it out across the CPUs this
+    # process may use (affinity/cgroup aware), never more workers than images
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    workers = min(len(misses), cpus)
+    if len(misses) < MIN_PARALLEL_IMAGES or workers < 2:
+        for i in misses:
+            results[i] = analyze_one(images[i])
+    else:
+        chunksize = max(1, len(misses) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            fresh = ex.map(analyze_one, [images[i] for i in misses], chunksize=chunksize)
+            for i, info in zip(misses, fresh):
+                results[i] = info
+
+    # Snapshot before captions are attached (captions can change independently)
+    current_paths = {str(p) for p in images}
+    cache_entries = {k: v for k, v in cache.items() if v.get('path') not in current_paths}
+    cache_entries.update(
+        (key, dict(info)) for key, info in zip(cache_keys, results) if 'error' not in info
+    )
+
+    caption_index = {}
+    verbose_lines = []
+    for img_path, info in zip(images, results):
         image_infos.append(info)
 
         if 'width' in info and 'height' in info:
@@ -471,49 +841,45 @@ Examples:
         if info.get('rotation', 0) != 0:
             rotated_images.append(info['name'])
 
-        # Blur score
-        blur = calculate_blur_score(img_path)
-        if blur is not None:
-            info['blur_score'] = blur
-            blur_scores.append(blur)
+        if 'blur_score' in info:
+            blur_scores.append(info['blur_score'])
 
-        # Perceptual hash
-        phash = calculate_perceptual_hash(img_path)
-        if phash:
-            info['phash'] = phash
-            hashes[phash].append(info['name'])
+        if 'phash' in info:
+            hash_buckets[aspect_bin(info['aspect_ratio'])][info['phash']].append(info['name'])
 
         # Caption
-        caption_path = find_caption(img_path, data_dir)
+        caption_path = find_caption(img_path, data_dir, caption_index)
         caption_paths.append(caption_path)
         info['has_caption'] = caption_path is not None
 
         if args.verbose:
             status = "+" if info.get('has_caption') else "-"
             blur_str = f" blur={info.get('blur_score', 'N/A')}" if 'blur_score' in info else ""
-            print(f"  [{status}] {info['name']} {info.get('width', '?')}x{info.get('height', '?')}{blur_str}")
+            verbose_lines.append(f"  [{status}] {info['name']} {info.get('width', '?')}x{info.get('height', '?')}{blur_str}")
+
+    # Emit per-image lines in one write rather than one syscall per image
+    if verbose_lines:
+        sys.stdout.write('\n'.join(verbose_lines) + '\n')
 
     # Find duplicates
-    duplicates = find_duplicates(hashes)
+    duplicates = find_duplicates_by_aspect(hash_buckets)
 
     # Analyze captions
     caption_analysis = analyze_captions(caption_paths)
 
     # Resolution statistics
-    if resolutions:
-        widths = [w for w, h in resolutions]
-        heights = [h for w, h in resolutions]
-
+    res_stats = resolution_stats(resolutions) if resolutions else None
+    if res_stats:
         print("\nResolution Statistics:")
-        print(f"  Min: {min(widths)}x{min(heights)}")
-        print(f"  Max: {max(widths)}x{max(heights)}")
-        print(f"  Avg: {int(sum(widths)/len(widths))}x{int(sum(heights)/len(heights))}")
+        print(f"  Min: {res_stats['min_width']}x{res_stats['min_height']}")
+        print(f"  Max: {res_stats['max_width']}x{res_stats['max_height']}")
+        print(f"  Avg: {res_stats['avg_width']}x{res_stats['avg_height']}")
 
     # Aspect ratio distribution
-    if aspect_ratios:
-        ar_buckets = Counter(round(ar, 1) for ar in aspect_ratios)
+    ar_buckets = aspect_ratio_distribution(aspect_ratios) if aspect_ratios else {}
+    if ar_buckets:
         print("\nAspect Ratio Distribution:")
-        for ar, count in sorted(ar_buckets.items()):
+        for ar, count in ar_buckets.items():
             bar = "#" * min(count, 20)
             label = "landscape" if ar > 1.1 else ("portrait" if ar < 0.9 else "square")
             print(f"  {ar:.1f} ({label}): {bar} ({count})")
@@ -582,12 +948,12 @@ Examples:
         'data_dir': str(data_dir),
         'image_count': len(images),
         'resolution_stats': {
-            'min_width': min(w for w, h in resolutions) if resolutions else None,
-            'min_height': min(h for w, h in resolutions) if resolutions else None,
-            'max_width': max(w for w, h in resolutions) if resolutions else None,
-            'max_height': max(h for w, h in resolutions) if resolutions else None,
+            'min_width': res_stats['min_width'] if res_stats else None,
+            'min_height': res_stats['min_height'] if res_stats else None,
+            'max_width': res_stats['max_width'] if res_stats else None,
+            'max_height': res_stats['max_height'] if res_stats else None,
         },
-        'aspect_ratio_distribution': dict(Counter(round(ar, 1) for ar in aspect_ratios)) if aspect_ratios else {},
+        'aspect_ratio_distribution': ar_buckets,
         'blur_stats': {
             'min': min(blur_scores) if blur_scores else None,
             'max': max(blur_scores) if blur_scores else None,
@@ -600,9 +966,9 @@ Examples:
     }
 
     # Save report
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w') as f:
-        json.dump(report, f, indent=2)
+    write_report(report, output_path)
+    if not args.no_cache:
+        save_analysis_cache(cache_path, cache_entries)
 
     print(f"\nReport saved to: {output_path}")
     print("=" * 60)
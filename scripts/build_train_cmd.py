@@ -18,6 +18,7 @@ Usage:
     python scripts/build_train_cmd.py --profile fast
     python scripts/build_train_cmd.py --profile final --dry-run
     python scripts/build_train_cmd.py --profile fast --output-json
+    python scripts/build_train_cmd.py --profiles fast,final --output-json
 
     # With env overrides:
     RANK=48 MAX_STEPS=2000 python scripts/build_train_cmd.py --profile fast
@@ -27,12 +28,19 @@ Usage:
 """
 
 import argparse
+import contextlib
+import copy
+import glob
+import io
 import json
 import os
+import shlex
 import sys
 import hashlib
 import subprocess
+from collections.abc import Mapping
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 # Try tomllib (Python 3.11+) or fall back to tomli
@@ -106,70 +114,97 @@ FLUX_REQUIRED_PARAMS = {
     "discrete_flow_shift": 1.0,
 }
 
+# Env var -> config key overrides (order matters: UNET_LR wins over LEARNING_RATE)
+_ENV_MAP = (
+    ("RANK", "network_dim"),
+    ("ALPHA", "network_alpha"),
+    ("MAX_STEPS", "max_train_steps"),
+    ("RESOLUTION", "resolution"),
+    ("LEARNING_RATE", "learning_rate"),
+    ("UNET_LR", "learning_rate"),
+    ("WARMUP", "lr_warmup_steps"),
+    ("NOISE_OFFSET", "noise_offset"),
+    ("DROPOUT", "network_dropout"),
+    ("SNR_GAMMA", "min_snr_gamma"),
+    ("GRAD_ACCUM", "gradient_accumulation_steps"),
+    ("BATCH_SIZE", "train_batch_size"),
+    ("SEED", "seed"),
+    ("OPTIMIZER", "optimizer_type"),
+    ("SCHEDULER", "lr_scheduler"),
+    ("MIN_BUCKET", "min_bucket_reso"),
+    ("MAX_BUCKET", "max_bucket_reso"),
+)
+
+# Type conversion for env var overrides (keys not listed stay strings)
+_COERCE = {
+    "network_dim": int,
+    "network_alpha": int,
+    "max_train_steps": int,
+    "lr_warmup_steps": int,
+    "gradient_accumulation_steps": int,
+    "train_batch_size": int,
+    "seed": int,
+    "resolution": int,
+    "min_bucket_reso": int,
+    "max_bucket_reso": int,
+    "learning_rate": float,
+    "noise_offset": float,
+    "network_dropout": float,
+    "min_snr_gamma": float,
+}
+
+
+@lru_cache(maxsize=None)
+def _parse_toml(config_path: str, mtime_ns: int, size: int) -> dict:
+    """
+    Parse a TOML file; mtime/size are part of the cache key so edits are picked up.
+
+    The cached dict is shared - never hand it out without copying.
+    """
+    with open(config_path, "rb") as f:
+        return tomllib.load(f)
+
 
 def load_toml_config(profile: str, workspace: str) -> dict:
-    """Load TOML config for the given profile."""
+    """
+    Load TOML config for the given profile.
+
+    Parsing is cached per (path, mtime, size) for in-process callers; each
+    call returns a deep copy, so callers may modify the result freely.
+    """
     config_path = Path(workspace) / "configs" / f"flux_{profile}.toml"
 
-    if not config_path.exists():
+    try:
+        st = config_path.stat()
+    except FileNotFoundError:
         print(f"WARNING: TOML config not found: {config_path}", file=sys.stderr)
         print(f"WARNING: Using profile defaults for '{profile}'", file=sys.stderr)
         return {}
 
-    with open(config_path, "rb") as f:
-        return tomllib.load(f)
+    return copy.deepcopy(_parse_toml(str(config_path), st.st_mtime_ns, st.st_size))
 
 
-def flatten_toml_config(toml_config: dict) -> dict:
+def flatten_toml_config(toml_config: Mapping) -> dict:
     """Flatten nested TOML sections into a single dict."""
-    flat = {}
-    for section, values in toml_config.items():
-        if isinstance(values, dict):
-            flat.update(values)
-        else:
-            flat[section] = values
-    return flat
+    # One comprehension, same last-wins order as updating section by section
+    return {
+        key: value
+        for section, values in toml_config.items()
+        for key, value in (values.items() if isinstance(values, dict) else ((section, values),))
+    }
 
 
 def get_env_overrides() -> dict:
     """Get configuration overrides from environment variables."""
     overrides = {}
 
-    # Map env vars to config keys
-    env_mappings = {
-        "RANK": "network_dim",
-        "ALPHA": "network_alpha",
-        "MAX_STEPS": "max_train_steps",
-        "RESOLUTION": "resolution",
-        "LEARNING_RATE": "learning_rate",
-        "UNET_LR": "learning_rate",
-        "WARMUP": "lr_warmup_steps",
-        "NOISE_OFFSET": "noise_offset",
-        "DROPOUT": "network_dropout",
-        "SNR_GAMMA": "min_snr_gamma",
-        "GRAD_ACCUM": "gradient_accumulation_steps",
-        "BATCH_SIZE": "train_batch_size",
-        "SEED": "seed",
-        "OPTIMIZER": "optimizer_type",
-        "SCHEDULER": "lr_scheduler",
-        "MIN_BUCKET": "min_bucket_reso",
-        "MAX_BUCKET": "max_bucket_reso",
-    }
-
-    for env_var, config_key in env_mappings.items():
-        value = os.environ.get(env_var)
+    environ = os.environ
+    for env_var, config_key in _ENV_MAP:
+        value = environ.get(env_var)
         if value is not None and value.strip():  # Skip empty strings
-            # Try to convert to appropriate type
+            # Convert to the key's type (str when not listed)
             try:
-                if config_key in ["network_dim", "network_alpha", "max_train_steps",
-                                  "lr_warmup_steps", "gradient_accumulation_steps",
-                                  "train_batch_size", "seed", "resolution",
-                                  "min_bucket_reso", "max_bucket_reso"]:
-                    overrides[config_key] = int(value)
-                elif config_key in ["learning_rate", "noise_offset", "network_dropout", "min_snr_gamma"]:
-                    overrides[config_key] = float(value)
-                else:
-                    overrides[config_key] = value
+                overrides[config_key] = _COERCE.get(config_key, str)(value)
             except ValueError:
                 pass  # Skip invalid values instead of storing them
 
@@ -219,11 +254,12 @@ def validate_config(config: dict, allow_alpha_mismatch: bool = False) -> list:
 
 
 def build_command(config: dict, paths: dict, run_name: str, resume_from: str = None,
-                  fp8_base: bool = False, profile: str = "fast") -> str:
+                  fp8_base: bool = False, profile: str = "fast") -> list[str]:
     """
     Build the accelerate launch command for kohya-ss flux_train_network.py.
 
     This is the canonical command builder - all training scripts should use this.
+    Returns the argv list; use shlex.join() when a shell string is needed.
     """
     train_script = f"{paths['sdscripts']}/flux_train_network.py"
 
@@ -376,21 +412,40 @@ def build_command(config: dict, paths: dict, run_name: str, resume_from: str = N
         else:
             print(f"WARNING: Resume checkpoint not found: {resume_from}", file=sys.stderr)
 
-    # Build final command string with proper quoting
-    # Quote paths that might have spaces
-    quoted_parts = []
-    for part in cmd_parts:
-        if "=" in part:
-            key, value = part.split("=", 1)
-            # Quote values with spaces
-            if " " in value:
-                quoted_parts.append(f'{key}="{value}"')
-            else:
-                quoted_parts.append(part)
-        else:
-            quoted_parts.append(part)
+    return cmd_parts
 
-    return " ".join(quoted_parts)
+
+@lru_cache(maxsize=1)
+def _gpu_info() -> str:
+    """
+    Describe the first GPU (static per host, so computed once per process).
+
+    nvidia-smi gives the recorded "name, memory.total" value. The driver's
+    procfs entry only carries the model name, so it is used as a fallback
+    when nvidia-smi is missing or fails.
+    """
+    try:
+        result = subprocess.run(
+            ["nvidia-smi", "--query-gpu=name,memory.total", "--format=csv,noheader"],
+            capture_output=True,
+            timeout=2,
+        )
+        gpu_info = result.stdout.decode().strip() if result.returncode == 0 else ""
+        if gpu_info:
+            return gpu_info.split("\n")[0]
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        pass
+
+    for info_path in sorted(glob.glob("/proc/driver/nvidia/gpus/*/information")):
+        try:
+            with open(info_path) as f:
+                for line in f:
+                    if line.startswith("Model:"):
+                        return line.split(":", 1)[1].strip()
+        except OSError:
+            continue
+
+    return "unknown"
 
 
 def generate_repro_info(config: dict, paths: dict, run_name: str, profile: str) -> dict:
@@ -402,35 +457,33 @@ def generate_repro_info(config: dict, paths: dict, run_name: str, profile: str)
         "hostname": os.uname().nodename,
     }
 
-    # Git info
+    # Git info: one `git status` call reports both HEAD (branch.oid header)
+    # and dirtiness (any non-header line), instead of two subprocesses
     try:
-        git_commit = subprocess.check_output(
-            ["git", "rev-parse", "HEAD"],
-            stderr=subprocess.DEVNULL,
-            cwd=paths.get("workspace", ".")
-        ).decode().strip()
-        repro["git_commit"] = git_commit
-
-        # Check if dirty
         git_status = subprocess.check_output(
-            ["git", "status", "--porcelain"],
+            ["git", "status", "--porcelain=v2", "--branch"],
             stderr=subprocess.DEVNULL,
             cwd=paths.get("workspace", ".")
-        ).decode().strip()
-        repro["git_dirty"] = len(git_status) > 0
+        ).decode()
+
+        git_commit = None
+        git_dirty = False
+        for line in git_status.splitlines():
+            if line.startswith("# branch.oid "):
+                git_commit = line.split(" ", 2)[2]
+            elif line and not line.startswith("#"):
+                git_dirty = True
+
+        if git_commit is None or git_commit == "(initial)":
+            raise subprocess.CalledProcessError(1, "git")  # no HEAD commit yet
+        repro["git_commit"] = git_commit
+        repro["git_dirty"] = git_dirty
     except (subprocess.CalledProcessError, FileNotFoundError):
         repro["git_commit"] = "unknown"
         repro["git_dirty"] = None
 
     # GPU info
-    try:
-        gpu_info = subprocess.check_output(
-            ["nvidia-smi", "--query-gpu=name,memory.total", "--format=csv,noheader"],
-            stderr=subprocess.DEVNULL
-        ).decode().strip()
-        repro["gpu"] = gpu_info.split("\n")[0] if gpu_info else "unknown"
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        repro["gpu"] = "unknown"
+    repro["gpu"] = _gpu_info()
 
     # Python version
     repro["python_version"] = sys.version.split()[0]
@@ -452,76 +505,75 @@ def generate_repro_info(config: dict, paths: dict, run_name: str, profile: str)
     return repro
 
 
+def _iter_file_info(root: str, data_dir: str):
+    """
+    Yield (rel_path, size, mtime) for every file under root.
+
+    Mirrors os.walk() semantics (symlinked dirs are not descended, file
+    symlinks are stat'ed through) while reusing scandir's DirEntry type info
+    instead of joining paths and calling os.stat() separately.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+
+        if is_dir:
+            if not entry.is_symlink():
+                yield from _iter_file_info(entry.path, data_dir)
+            continue
+
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        yield os.path.relpath(entry.path, data_dir), st.st_size, int(st.st_mtime)
+
+
 def compute_dataset_hash(data_dir: str) -> str:
     """
     Compute a stable hash of the dataset for reproducibility.
 
-    Uses file list + sizes + mtimes for speed (not content hash).
+    Uses file list + sizes + mtimes for speed (not content hash), digested
+    with BLAKE2b (128-bit, same hex length as the MD5 used previously).
     """
     if not os.path.isdir(data_dir):
         return "dataset_not_found"
 
-    file_info = []
-    for root, dirs, files in os.walk(data_dir):
-        for f in sorted(files):
-            fpath = os.path.join(root, f)
-            try:
-                stat = os.stat(fpath)
-                rel_path = os.path.relpath(fpath, data_dir)
-                file_info.append(f"{rel_path}:{stat.st_size}:{int(stat.st_mtime)}")
-            except OSError:
-                continue
-
+    file_info = sorted(f"{rel}:{size}:{mtime}" for rel, size, mtime in _iter_file_info(data_dir, data_dir))
     if not file_info:
         return "empty_dataset"
 
-    return hashlib.md5("\n".join(sorted(file_info)).encode()).hexdigest()
-
+    # Feed lines incrementally rather than building one large joined string
+    h = hashlib.blake2b(digest_size=16)
+    h.update(file_info[0].encode())
+    for line in file_info[1:]:
+        h.update(b"\n")
+        h.update(line.encode())
+    return h.hexdigest()
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Build training command from TOML config (Single Source of Truth)",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  python scripts/build_train_cmd.py --profile fast
-  python scripts/build_train_cmd.py --profile final --dry-run
-  RANK=48 MAX_STEPS=2000 python scripts/build_train_cmd.py --profile fast
-  RESUME_FROM=/path/to/checkpoint.safetensors python scripts/build_train_cmd.py --profile final
-        """
-    )
 
-    parser.add_argument("--profile", "-p", choices=["fast", "final"], default="fast",
-                       help="Training profile to use (default: fast)")
-    parser.add_argument("--dry-run", "-n", action="store_true",
-                       help="Print command and config info, don't output for execution")
-    parser.add_argument("--output-json", "-j", action="store_true",
-                       help="Output parsed config as JSON instead of command")
-    parser.add_argument("--allow-alpha-mismatch", action="store_true",
-                       help="Allow network_alpha != network_dim (not recommended)")
-    parser.add_argument("--workspace", "-w", default=None,
-                       help=f"Workspace path (default: {DEFAULT_WORKSPACE})")
-    parser.add_argument("--run-name", "-r", default=None,
-                       help="Override run name (default: auto-generated)")
-    parser.add_argument("--show-repro", action="store_true",
-                       help="Output reproducibility info as JSON")
-
-    args = parser.parse_args()
-
-    # Determine workspace
-    workspace = args.workspace or os.environ.get("WORKSPACE", DEFAULT_WORKSPACE)
-
-    # Auto-detect workspace if running from repo
-    script_dir = Path(__file__).parent.resolve()
-    if script_dir.name == "scripts":
-        workspace = str(script_dir.parent)
+def build_for_profile(profile: str, workspace: str, run_name: str = None,
+                      allow_alpha_mismatch: bool = False) -> dict:
+    """
+    Resolve the full config for a profile (defaults < TOML < env) and build its command.
 
+    Returns the structure printed by --output-json. Importable so other
+    scripts (e.g. validate_config_usage.py) can build commands in-process.
+    """
     # Load TOML config
-    toml_config = load_toml_config(args.profile, workspace)
+    toml_config = load_toml_config(profile, workspace)
     flat_config = flatten_toml_config(toml_config)
 
     # Start with profile defaults
-    config = PROFILE_DEFAULTS[args.profile].copy()
+    config = PROFILE_DEFAULTS[profile].copy()
 
     # Merge TOML config (overrides defaults)
     config.update(flat_config)
@@ -556,15 +608,13 @@ Examples:
         print(f"[AUTO] Adjusted min_bucket_reso: {min_bucket} -> {new_min_bucket}", file=sys.stderr)
 
     # Validate configuration
-    warnings = validate_config(config, args.allow_alpha_mismatch)
+    warnings = validate_config(config, allow_alpha_mismatch)
     for w in warnings:
         print(w, file=sys.stderr)
 
     # Generate run name
-    if args.run_name:
-        run_name = args.run_name
-    else:
-        run_name = os.environ.get("RUN_NAME", f"flux_{args.profile}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    if not run_name:
+        run_name = os.environ.get("RUN_NAME", f"flux_{profile}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
 
     # Build paths dict
     paths = {
@@ -584,28 +634,107 @@ Examples:
     # FP8 base toggle
     fp8_base = os.environ.get("FP8_BASE", "0") == "1"
 
-    # Build the command
-    command = build_command(
+    # Build the command (argv list, plus a shell-quoted string for eval/bash -c)
+    argv = build_command(
         config=config,
         paths=paths,
         run_name=run_name,
         resume_from=resume_from if resume_from else None,
         fp8_base=fp8_base,
-        profile=args.profile
+        profile=profile
     )
+    command = shlex.join(argv)
+
+    return {
+        "profile": profile,
+        "run_name": run_name,
+        "config": config,
+        "paths": paths,
+        "command": command,
+        "argv": argv,
+        "resume_from": resume_from if resume_from else None,
+        "fp8_base": fp8_base,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build training command from TOML config (Single Source of Truth)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python scripts/build_train_cmd.py --profile fast
+  python scripts/build_train_cmd.py --profile final --dry-run
+  python scripts/build_train_cmd.py --profiles fast,final --output-json
+  RANK=48 MAX_STEPS=2000 python scripts/build_train_cmd.py --profile fast
+  RESUME_FROM=/path/to/checkpoint.safetensors python scripts/build_train_cmd.py --profile final
+        """
+    )
+
+    parser.add_argument("--profile", "-p", choices=["fast", "final"], default="fast",
+                       help="Training profile to use (default: fast)")
+    parser.add_argument("--dry-run", "-n", action="store_true",
+                       help="Print command and config info, don't output for execution")
+    parser.add_argument("--output-json", "-j", action="store_true",
+                       help="Output parsed config as JSON instead of command")
+    parser.add_argument("--allow-alpha-mismatch", action="store_true",
+                       help="Allow network_alpha != network_dim (not recommended)")
+    parser.add_argument("--workspace", "-w", default=None,
+                       help=f"Workspace path (default: {DEFAULT_WORKSPACE})")
+    parser.add_argument("--run-name", "-r", default=None,
+                       help="Override run name (default: auto-generated)")
+    parser.add_argument("--show-repro", action="store_true",
+                       help="Output reproducibility info as JSON")
+    parser.add_argument("--profiles", default=None,
+                       help="Comma-separated profiles to build in one run (with --output-json, emits a JSON array; "
+                            "profiles that fail validation get an \"error\" entry and the exit code is 1)")
+
+    args = parser.parse_args()
+
+    # Determine workspace
+    workspace = args.workspace or os.environ.get("WORKSPACE", DEFAULT_WORKSPACE)
+
+    # Auto-detect workspace if running from repo
+    script_dir = Path(__file__).parent.resolve()
+    if script_dir.name == "scripts":
+        workspace = str(script_dir.parent)
+
+    # Batch mode: several profiles in one invocation (one interpreter start)
+    if args.profiles:
+        profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+        unknown = [p for p in profiles if p not in PROFILE_DEFAULTS]
+        if unknown:
+            parser.error(f"unknown profile(s) in --profiles: {', '.join(unknown)}")
+        if not args.output_json:
+            parser.error("--profiles requires --output-json")
+        # Build each profile independently: a validation exit in one profile
+        # becomes an error entry for that profile instead of aborting the rest
+        outputs = []
+        for p in profiles:
+            captured = io.StringIO()
+            try:
+                with contextlib.redirect_stderr(captured):
+                    outputs.append(build_for_profile(p, workspace, args.run_name, args.allow_alpha_mismatch))
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+                outputs.append({"profile": p, "error": captured.getvalue().rstrip(), "exit_code": code})
+            sys.stderr.write(captured.getvalue())
+        print(json.dumps(outputs, indent=2, default=str))
+        if any("error" in o for o in outputs):
+            sys.exit(1)
+        return
+
+    result = build_for_profile(args.profile, workspace, args.run_name, args.allow_alpha_mismatch)
+    run_name = result["run_name"]
+    config = result["config"]
+    paths = result["paths"]
+    command = result["command"]
+    resume_from = result["resume_from"]
+    fp8_base = result["fp8_base"]
 
     # Output mode
     if args.output_json:
-        output = {
-            "profile": args.profile,
-            "run_name": run_name,
-            "config": config,
-            "paths": paths,
-            "command": command,
-            "resume_from": resume_from if resume_from else None,
-            "fp8_base": fp8_base,
-        }
-        print(json.dumps(output, indent=2, default=str))
+        print(json.dumps(result, indent=2, default=str))
     elif args.show_repro:
         repro = generate_repro_info(config, paths, run_name, args.profile)
         repro["dataset_hash"] = compute_dataset_hash(paths["data"])
@@ -15,6 +15,7 @@ This script checks that:
 Usage:
     python scripts/validate_config_usage.py
     python scripts/validate_config_usage.py --verbose
+    python scripts/validate_config_usage.py --output-json
 
 Exit codes:
     0 - All validations passed
@@ -22,10 +23,19 @@ Exit codes:
 """
 
 import argparse
+import contextlib
+import hashlib
+import io
+import json
 import os
+import pickle
+import shlex
+import shutil
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 # Try tomllib (Python 3.11+) or fall back to tomli
 try:
@@ -37,6 +47,40 @@ except ImportError:
         print("ERROR: No TOML library found. Install with: pip install tomli", file=sys.stderr)
         sys.exit(1)
 
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+
+# Interpreter for the subprocess fallback, resolved once (sys.executable can be
+# empty in embedded interpreters)
+PYTHON_EXE = sys.executable or shutil.which("python3")
+
+# Parsed-TOML cache, relative to the workspace root
+VALIDATE_CACHE_DIR = ".validate_cache"
+
+# Environment read by build_for_profile besides build_train_cmd._ENV_MAP;
+# both are part of each profile's skip-stamp key
+STAMP_EXTRA_ENV = (
+    "RESUME_FROM", "FP8_BASE", "RUN_NAME", "SDSCRIPTS", "MODEL_PATH", "TEXT_ENCODER_PATH",
+    "DATA_DIR", "OUT_DIR", "LOG_DIR", "SAMPLE_PROMPTS",
+)
+
+# Sections every training TOML must define
+REQUIRED_SECTIONS = ("network", "training")
+
+# Expected noise_offset per profile (unknown profiles use the final value)
+EXPECTED_NOISE = {"fast": 0.05, "final": 0.1}
+
+# Arguments FLUX training requires in every generated command
+FLUX_PARAMS = ("--guidance_scale=1.0", "--timestep_sampling=flux_shift", "--model_prediction_type=raw")
+
 
 def get_workspace() -> Path:
     """Get workspace path."""
@@ -46,211 +90,478 @@ def get_workspace() -> Path:
     return Path.cwd()
 
 
-def check_script_references_build_train_cmd(script_path: Path) -> tuple[bool, str]:
+def _result(name: str, status: str, detail: str, profile: Optional[str] = None) -> dict:
+    """One check outcome; status is OK, WARN or FAIL (INFO for verbose extras)."""
+    return {"name": name, "status": status, "profile": profile, "detail": detail}
+
+
+def format_result(result: dict) -> str:
+    """Render a check result as a text report line."""
+    if result["status"] == "INFO":
+        return f"\n[{result['profile']}] {result['detail']}"
+    if result["profile"]:
+        return f"{result['status']} [{result['profile']}]: {result['detail']}"
+    return f"{result['status']}: {result['detail']}"
+
+
+def _list_files(directory: Path) -> frozenset[str]:
+    """Names of regular files in directory, from a single scandir pass."""
+    try:
+        with os.scandir(directory) as it:
+            return frozenset(e.name for e in it if e.is_file())
+    except OSError:
+        return frozenset()
+
+
+def _exists(path: Path, present: Optional[frozenset[str]]) -> bool:
+    """Check path against a prefetched listing of its directory, else stat it."""
+    return path.name in present if present is not None else path.exists()
+
+
+def _file_contains(path: Path, needle: bytes, chunk_size: int = 65536) -> bool:
+    """Stream a file in chunks, stopping at the first occurrence of needle."""
+    tail = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return False
+            data = tail + chunk
+            if needle in data:
+                return True
+            # Keep enough bytes to catch a match straddling chunk boundaries
+            tail = data[-(len(needle) - 1):]
+
+
+def check_script_references_build_train_cmd(script_path: Path,
+                                            present: Optional[frozenset[str]] = None) -> tuple[bool, dict]:
     """Check that a script references build_train_cmd.py."""
-    if not script_path.exists():
-        return False, f"Script not found: {script_path}"
+    if not _exists(script_path, present):
+        return False, _result("script_reference", "FAIL", f"Script not found: {script_path}")
 
-    content = script_path.read_text()
-    if "build_train_cmd.py" in content:
-        return True, f"OK: {script_path.name} references build_train_cmd.py"
+    if _file_contains(script_path, b"build_train_cmd.py"):
+        return True, _result("script_reference", "OK", f"{script_path.name} references build_train_cmd.py")
     else:
-        return False, f"FAIL: {script_path.name} does NOT reference build_train_cmd.py"
+        return False, _result("script_reference", "FAIL", f"{script_path.name} does NOT reference build_train_cmd.py")
 
 
-def check_toml_loadable(toml_path: Path) -> tuple[bool, str]:
-    """Check that a TOML file is loadable."""
-    if not toml_path.exists():
-        return False, f"TOML not found: {toml_path}"
+def _load_toml_cached(toml_path: Path, cache_dir: Optional[Path]) -> dict:
+    """
+    Parse a TOML file, reusing a pickled result from cache_dir if the file's
+    mtime and size are unchanged since it was cached.
+    """
+    if cache_dir is None:
+        with open(toml_path, "rb") as f:
+            return tomllib.load(f)
 
+    st = os.stat(toml_path)
+    cache_file = cache_dir / f"{hashlib.sha1(str(toml_path).encode()).hexdigest()}.pkl"
     try:
-        with open(toml_path, "rb") as f:
-            config = tomllib.load(f)
+        with open(cache_file, "rb") as f:
+            cached = pickle.load(f)
+        if cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+            return cached["config"]
+    except Exception:
+        pass  # Missing or unreadable cache entry - parse below
+
+    with open(toml_path, "rb") as f:
+        config = tomllib.load(f)
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as f:
+            pickle.dump({"mtime_ns": st.st_mtime_ns, "size": st.st_size, "config": config}, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass  # Caching is best effort
+
+    return config
+
+
+def check_toml_loadable(toml_path: Path, cache_dir: Optional[Path] = None,
+                        present: Optional[frozenset[str]] = None) -> tuple[bool, dict]:
+    """Check that a TOML file is loadable (parse cached in cache_dir when given)."""
+    if not _exists(toml_path, present):
+        return False, _result("toml", "FAIL", f"TOML not found: {toml_path}")
+
+    try:
+        config = _load_toml_cached(toml_path, cache_dir)
 
         # Check required sections
-        required_sections = ["network", "training"]
-        missing = [s for s in required_sections if s not in config]
+        missing = [s for s in REQUIRED_SECTIONS if s not in config]
         if missing:
-            return False, f"FAIL: {toml_path.name} missing sections: {missing}"
+            return False, _result("toml", "FAIL", f"{toml_path.name} missing sections: {missing}")
 
-        return True, f"OK: {toml_path.name} is valid TOML with required sections"
+        return True, _result("toml", "OK", f"{toml_path.name} is valid TOML with required sections")
     except Exception as e:
-        return False, f"FAIL: {toml_path.name} parse error: {e}"
+        return False, _result("toml", "FAIL", f"{toml_path.name} parse error: {e}")
 
 
-def check_generated_command(profile: str, workspace: Path, verbose: bool = False) -> tuple[bool, list[str]]:
-    """Run build_train_cmd.py and validate the generated command."""
-    build_script = workspace / "scripts" / "build_train_cmd.py"
-    if not build_script.exists():
-        return False, [f"FAIL: build_train_cmd.py not found at {build_script}"]
+def _load_build_module(workspace: Path):
+    """Import build_train_cmd from the workspace, or None if it can't be used in-process."""
+    scripts_dir = str(workspace / "scripts")
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
 
-    # Run the build script
+    # build_train_cmd derives its default paths from WORKSPACE at import time
+    previous = os.environ.get("WORKSPACE")
+    os.environ["WORKSPACE"] = str(workspace)
+    try:
+        import build_train_cmd
+    except (Exception, SystemExit):
+        return None
+    finally:
+        if previous is None:
+            os.environ.pop("WORKSPACE", None)
+        else:
+            os.environ["WORKSPACE"] = previous
+
+    return build_train_cmd if hasattr(build_train_cmd, "build_for_profile") else None
+
+
+def _build_in_process(module, profiles: list[str], workspace: Path) -> tuple[dict, dict]:
+    """Call build_for_profile per profile; returns ({profile: output}, {profile: failure detail})."""
+    outputs, failures = {}, {}
+    for p in profiles:
+        captured = io.StringIO()
+        try:
+            with contextlib.redirect_stderr(captured):
+                outputs[p] = module.build_for_profile(p, str(workspace))
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+            failures[p] = f"build_train_cmd.py exited with code {code}\n{captured.getvalue().rstrip()}"
+        except Exception as e:
+            failures[p] = f"Could not run build_train_cmd.py: {e}"
+    return outputs, failures
+
+
+def _build_subprocess(build_script: Path, profiles: list[str], workspace: Path) -> tuple[dict, dict]:
+    """
+    Run build_train_cmd.py --profiles ... --output-json once for all profiles.
+
+    Returns ({profile: output}, {profile: failure detail}); profiles that fail
+    validation come back as per-profile "error" entries in the JSON array.
+    """
     env = os.environ.copy()
     env["WORKSPACE"] = str(workspace)
 
+    # Isolated mode and no .pyc writes; -I implies -E, so PYTHON* env vars would
+    # be ignored anyway. Skip site.py too unless build_train_cmd.py needs the
+    # site-installed tomli (Python < 3.11, or an interpreter of unknown version).
+    if PYTHON_EXE == sys.executable and sys.version_info >= (3, 11):
+        flags = ["-I", "-S", "-B"]
+    else:
+        flags = ["-I", "-B"]
     try:
-        result = subprocess.run(
-            ["python3", str(build_script), "--profile", profile, "--output-json"],
-            capture_output=True,
-            text=True,
+        with subprocess.Popen(
+            [PYTHON_EXE, *flags, str(build_script), "--profiles", ",".join(profiles), "--output-json"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             env=env,
             cwd=str(workspace)
-        )
+        ) as proc:
+            out, err = proc.communicate()
     except Exception as e:
-        return False, [f"FAIL: Could not run build_train_cmd.py: {e}"]
+        return {}, {p: f"Could not run build_train_cmd.py: {e}" for p in profiles}
 
-    if result.returncode != 0:
-        return False, [f"FAIL: build_train_cmd.py exited with code {result.returncode}", result.stderr]
-
-    import json
+    # Raw stdout bytes go straight to the JSON parser - no text decode
     try:
-        output = json.loads(result.stdout)
+        entries = _loads(out)
     except json.JSONDecodeError as e:
-        return False, [f"FAIL: Could not parse JSON output: {e}"]
+        if proc.returncode != 0:
+            detail = f"build_train_cmd.py exited with code {proc.returncode}\n{err.decode(errors='replace').rstrip()}"
+        else:
+            detail = f"Could not parse JSON output: {e}"
+        return {}, {p: detail for p in profiles}
+
+    outputs, failures = {}, {}
+    for entry in entries:
+        p = entry.get("profile")
+        if "error" in entry:
+            failures[p] = f"build_train_cmd.py exited with code {entry.get('exit_code', 1)}\n{entry['error']}"
+        else:
+            outputs[p] = entry
+    return outputs, failures
+
+
+def _profile_inputs(profile: str, workspace: Path, build_script: Path) -> dict:
+    """(mtime_ns, size) of each file a profile's validation result depends on (None if missing)."""
+    inputs = {}
+    for path in (build_script, workspace / "configs" / f"flux_{profile}.toml", Path(__file__)):
+        try:
+            st = os.stat(path)
+            inputs[str(path)] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            inputs[str(path)] = None
+    return inputs
+
+
+def _stamp_env(module) -> dict:
+    """Current values of every environment variable build_for_profile reads."""
+    names = [env_var for env_var, _ in module._ENV_MAP] + list(STAMP_EXTRA_ENV)
+    return {name: os.environ.get(name) for name in names}
+
+
+def _read_stamp(cache_dir: Path, profile: str) -> Optional[dict]:
+    """Load the last passing result recorded for a profile, if any."""
+    try:
+        with open(cache_dir / f"stamp-{profile}", "rb") as f:
+            return _loads(f.read())
+    except Exception:
+        return None
+
 
+def _write_stamp(cache_dir: Path, profile: str, stamp: dict):
+    """Record a passing result for a profile as JSON (best effort)."""
+    stamp_file = cache_dir / f"stamp-{profile}"
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = stamp_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as f:
+            f.write(_dumps(stamp))
+        os.replace(tmp_file, stamp_file)
+    except OSError:
+        pass
+
+
+def check_generated_commands(profiles: list[str], workspace: Path, verbose: bool = False,
+                             present: Optional[frozenset[str]] = None, cache_dir: Optional[Path] = None,
+                             force: bool = False) -> dict[str, tuple[bool, list[dict]]]:
+    """
+    Build commands for all profiles and validate each generated command.
+
+    With cache_dir, a profile whose inputs are unchanged since its last
+    passing run reuses that result instead of being rebuilt, unless force is
+    set. Inputs are the (mtime_ns, size) of the build script, the profile's
+    TOML and this validator, plus every environment variable the builder
+    reads. Stamps are only used when the builder module can be imported,
+    since its _ENV_MAP defines that variable list.
+    """
+    build_script = workspace / "scripts" / "build_train_cmd.py"
+    if not _exists(build_script, present):
+        return {p: (False, [_result("build", "FAIL", f"build_train_cmd.py not found at {build_script}", p)])
+                for p in profiles}
+
+    # Prefer calling the builder in-process; fall back to one subprocess for all profiles
+    module = _load_build_module(workspace)
+
+    results = {}
+    stamp_keys = {}
+    if cache_dir is not None and module is not None:
+        env = _stamp_env(module)
+        for p in profiles:
+            stamp_keys[p] = {"inputs": _profile_inputs(p, workspace, build_script), "env": env, "verbose": verbose}
+            stamp = None if force else _read_stamp(cache_dir, p)
+            if stamp and all(stamp.get(k) == v for k, v in stamp_keys[p].items()):
+                results[p] = (True, stamp["results"] + [
+                    _result("cache", "OK", "inputs unchanged since last passing run (cached; --force to re-run)", p)
+                ])
+
+    stale = [p for p in profiles if p not in results]
+    if not stale:
+        return results
+
+    if module is not None:
+        outputs, failures = _build_in_process(module, stale, workspace)
+    else:
+        outputs, failures = _build_subprocess(build_script, stale, workspace)
+
+    for p in stale:
+        if p in failures:
+            results[p] = (False, [_result("build", "FAIL", failures[p], p)])
+            continue
+        if p not in outputs:
+            results[p] = (False, [_result("build", "FAIL", "no output from build_train_cmd.py", p)])
+            continue
+        passed, checks = results[p] = validate_build_output(p, outputs[p], verbose)
+        if passed and p in stamp_keys:
+            _write_stamp(cache_dir, p, {**stamp_keys[p], "results": checks})
+
+    return {p: results[p] for p in profiles}
+
+
+def check_generated_command(profile: str, workspace: Path, verbose: bool = False) -> tuple[bool, list[dict]]:
+    """Run build_train_cmd.py and validate the generated command."""
+    return check_generated_commands([profile], workspace, verbose)[profile]
+
+
+def validate_build_output(profile: str, output: dict, verbose: bool = False) -> tuple[bool, list[dict]]:
+    """Validate one profile's build_train_cmd.py --output-json result."""
     command = output.get("command", "")
     config = output.get("config", {})
-    messages = []
+    results = []
     all_passed = True
+    # Check whole argv tokens, not substrings of the shell string
+    argv = output.get("argv") or shlex.split(command)
+    tokens = set(argv)
+    flag_values = dict(t.split("=", 1) for t in argv if t.startswith("--") and "=" in t)
 
     # P0: network_alpha must equal network_dim
     dim = config.get("network_dim", 32)
     alpha = config.get("network_alpha", 1)
     if alpha == dim:
-        messages.append(f"OK [{profile}]: network_alpha ({alpha}) == network_dim ({dim})")
+        results.append(_result("network_alpha", "OK", f"network_alpha ({alpha}) == network_dim ({dim})", profile))
     else:
-        messages.append(f"FAIL [{profile}]: network_alpha ({alpha}) != network_dim ({dim}) - P0 VIOLATION")
+        results.append(_result("network_alpha", "FAIL",
+                               f"network_alpha ({alpha}) != network_dim ({dim}) - P0 VIOLATION", profile))
         all_passed = False
 
     # P0: noise_offset should be present
     noise_offset = config.get("noise_offset", 0)
-    expected_noise = 0.05 if profile == "fast" else 0.1
+    expected_noise = EXPECTED_NOISE.get(profile, EXPECTED_NOISE["final"])
     if noise_offset > 0:
-        if f"--noise_offset={noise_offset}" in command or f"--noise_offset {noise_offset}" in command:
-            messages.append(f"OK [{profile}]: noise_offset={noise_offset} in command")
+        if flag_values.get("--noise_offset") == str(noise_offset):
+            results.append(_result("noise_offset", "OK", f"noise_offset={noise_offset} in command", profile))
         else:
             # Check if it's actually in the command
-            if "--noise_offset" in command:
-                messages.append(f"OK [{profile}]: noise_offset parameter present in command")
+            if "--noise_offset" in flag_values or "--noise_offset" in tokens:
+                results.append(_result("noise_offset", "OK", "noise_offset parameter present in command", profile))
             else:
-                messages.append(f"WARN [{profile}]: noise_offset={noise_offset} set but not found in command")
+                results.append(_result("noise_offset", "WARN",
+                                       f"noise_offset={noise_offset} set but not found in command", profile))
     else:
-        messages.append(f"WARN [{profile}]: noise_offset is 0 (expected ~{expected_noise})")
+        results.append(_result("noise_offset", "WARN", f"noise_offset is 0 (expected ~{expected_noise})", profile))
 
     # P0: network_dropout (final profile only)
     if profile == "final":
         dropout = config.get("network_dropout", 0)
         if dropout > 0:
-            messages.append(f"OK [{profile}]: network_dropout={dropout}")
+            results.append(_result("network_dropout", "OK", f"network_dropout={dropout}", profile))
         else:
-            messages.append(f"WARN [{profile}]: network_dropout is 0 (expected 0.1 for final)")
+            results.append(_result("network_dropout", "WARN", "network_dropout is 0 (expected 0.1 for final)", profile))
 
         # P0: min_snr_gamma (final profile only)
         snr_gamma = config.get("min_snr_gamma", 0)
         if snr_gamma > 0:
-            messages.append(f"OK [{profile}]: min_snr_gamma={snr_gamma}")
+            results.append(_result("min_snr_gamma", "OK", f"min_snr_gamma={snr_gamma}", profile))
         else:
-            messages.append(f"WARN [{profile}]: min_snr_gamma is 0 (expected 5.0 for final)")
+            results.append(_result("min_snr_gamma", "WARN", "min_snr_gamma is 0 (expected 5.0 for final)", profile))
 
     # P1: gradient_accumulation_steps
     grad_accum = config.get("gradient_accumulation_steps", 0)
     if grad_accum > 1:
-        messages.append(f"OK [{profile}]: gradient_accumulation_steps={grad_accum}")
+        results.append(_result("gradient_accumulation_steps", "OK",
+                               f"gradient_accumulation_steps={grad_accum}", profile))
     else:
-        messages.append(f"WARN [{profile}]: gradient_accumulation_steps not set (expected 4)")
+        results.append(_result("gradient_accumulation_steps", "WARN",
+                               "gradient_accumulation_steps not set (expected 4)", profile))
 
     # Check FLUX-required parameters
-    flux_params = ["--guidance_scale=1.0", "--timestep_sampling=flux_shift", "--model_prediction_type=raw"]
-    for param in flux_params:
-        if param in command:
-            messages.append(f"OK [{profile}]: FLUX param {param.split('=')[0]} present")
+    for param in FLUX_PARAMS:
+        flag = param.split("=")[0]
+        if param in tokens:
+            results.append(_result(flag[2:], "OK", f"FLUX param {flag} present", profile))
         else:
-            messages.append(f"FAIL [{profile}]: Missing FLUX param: {param}")
+            results.append(_result(flag[2:], "FAIL", f"Missing FLUX param: {param}", profile))
             all_passed = False
 
     # Check network_module is lora_flux (not lora)
-    if "--network_module=networks.lora_flux" in command:
-        messages.append(f"OK [{profile}]: network_module is networks.lora_flux")
+    if "--network_module=networks.lora_flux" in tokens:
+        results.append(_result("network_module", "OK", "network_module is networks.lora_flux", profile))
     else:
-        messages.append(f"FAIL [{profile}]: network_module should be networks.lora_flux")
+        results.append(_result("network_module", "FAIL", "network_module should be networks.lora_flux", profile))
         all_passed = False
 
     if verbose:
-        messages.append(f"\n[{profile}] Generated command preview (first 500 chars):\n{command[:500]}...")
+        results.append(_result("command_preview", "INFO",
+                               f"Generated command preview (first 500 chars):\n{command[:500]}...", profile))
 
-    return all_passed, messages
+    return all_passed, results
 
 
 def main():
     parser = argparse.ArgumentParser(description="Validate config usage in training scripts")
     parser.add_argument("--verbose", "-v", action="store_true", help="Show verbose output")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-validate all profiles even if their inputs are unchanged")
+    parser.add_argument("--output-json", action="store_true",
+                        help="Print results as JSON instead of the text report")
     args = parser.parse_args()
 
     workspace = get_workspace()
-    print(f"Workspace: {workspace}")
-    print("=" * 70)
-    print("FLUX.1-dev LoRA Training - Configuration Validation")
-    print("=" * 70)
-    print()
-
-    all_passed = True
-    messages = []
 
-    # 1. Check script references
-    print("1. Checking script references to build_train_cmd.py...")
     scripts_to_check = [
         workspace / "scripts" / "train_flux_fast.sh",
         workspace / "scripts" / "train_flux_final.sh",
         workspace / "scripts" / "train_dashboard.sh",
     ]
-
-    for script in scripts_to_check:
-        passed, msg = check_script_references_build_train_cmd(script)
-        print(f"   {msg}")
-        if not passed:
-            all_passed = False
-    print()
-
-    # 2. Check TOML files are loadable
-    print("2. Checking TOML configs are valid...")
     toml_files = [
         workspace / "configs" / "flux_fast.toml",
         workspace / "configs" / "flux_final.toml",
     ]
+    cache_dir = workspace / VALIDATE_CACHE_DIR
+    scripts_present = _list_files(workspace / "scripts")
+    configs_present = _list_files(workspace / "configs")
+
+    # All checks are independent file/subprocess work - run them concurrently,
+    # then report in the fixed order below
+    with ThreadPoolExecutor(max_workers=len(scripts_to_check) + len(toml_files) + 1) as ex:
+        script_futures = [ex.submit(check_script_references_build_train_cmd, s, scripts_present)
+                          for s in scripts_to_check]
+        toml_futures = [ex.submit(check_toml_loadable, t, cache_dir, configs_present) for t in toml_files]
+        commands_future = ex.submit(check_generated_commands, ["fast", "final"], workspace, args.verbose,
+                                    scripts_present, cache_dir, args.force)
+
+    script_checks = [f.result() for f in script_futures]
+    toml_checks = [f.result() for f in toml_futures]
+    command_checks = list(commands_future.result().values())
+    all_passed = all(passed for passed, _ in script_checks + toml_checks + command_checks)
+
+    if args.output_json:
+        results = [r for _, r in script_checks + toml_checks]
+        results += [r for _, profile_results in command_checks for r in profile_results]
+        sys.stdout.flush()
+        sys.stdout.buffer.write(_dumps({"workspace": str(workspace), "passed": all_passed, "results": results}))
+        sys.stdout.buffer.write(b"\n")
+        sys.exit(0 if all_passed else 1)
+
+    # Render the text report and write it once at the end
+    out = [
+        f"Workspace: {workspace}",
+        "=" * 70,
+        "FLUX.1-dev LoRA Training - Configuration Validation",
+        "=" * 70,
+        "",
+    ]
 
-    for toml_file in toml_files:
-        passed, msg = check_toml_loadable(toml_file)
-        print(f"   {msg}")
-        if not passed:
-            all_passed = False
-    print()
+    # 1. Check script references
+    out.append("1. Checking script references to build_train_cmd.py...")
+    out.extend(f"   {format_result(r)}" for _, r in script_checks)
+    out.append("")
+
+    # 2. Check TOML files are loadable
+    out.append("2. Checking TOML configs are valid...")
+    out.extend(f"   {format_result(r)}" for _, r in toml_checks)
+    out.append("")
 
     # 3. Check generated commands for each profile
-    print("3. Validating generated commands (P0/P1 flags)...")
-    for profile in ["fast", "final"]:
-        passed, msgs = check_generated_command(profile, workspace, args.verbose)
-        for msg in msgs:
-            print(f"   {msg}")
-        if not passed:
-            all_passed = False
-        print()
+    out.append("3. Validating generated commands (P0/P1 flags)...")
+    for _, profile_results in command_checks:
+        out.extend(f"   {format_result(r)}" for r in profile_results)
+        out.append("")
 
     # 4. Summary
-    print("=" * 70)
+    out.append("=" * 70)
     if all_passed:
-        print("RESULT: ALL VALIDATIONS PASSED")
-        print()
-        print("The training pipeline is correctly configured:")
-        print("  - Scripts use build_train_cmd.py (Single Source of Truth)")
-        print("  - TOML configs are valid and loadable")
-        print("  - P0 fixes are in place (alpha=rank, noise_offset, dropout, snr_gamma)")
-        print("  - FLUX-required parameters are present")
-        sys.exit(0)
+        out += [
+            "RESULT: ALL VALIDATIONS PASSED",
+            "",
+            "The training pipeline is correctly configured:",
+            "  - Scripts use build_train_cmd.py (Single Source of Truth)",
+            "  - TOML configs are valid and loadable",
+            "  - P0 fixes are in place (alpha=rank, noise_offset, dropout, snr_gamma)",
+            "  - FLUX-required parameters are present",
+        ]
     else:
-        print("RESULT: SOME VALIDATIONS FAILED")
-        print()
-        print("Please review the FAIL messages above and fix the issues.")
-        sys.exit(1)
+        out += [
+            "RESULT: SOME VALIDATIONS FAILED",
+            "",
+            "Please review the FAIL messages above and fix the issues.",
+        ]
+
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.exit(0 if all_passed else 1)
 
 
 if __name__ == "__main__":